@@ -6,6 +6,13 @@ import time
 import logging
 import threading
 import sys
+import queue
+import signal
+import socket
+import sqlite3
+import zlib
+import multiprocessing
+from contextlib import contextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 load_dotenv()
@@ -34,6 +41,11 @@ DAILY_TIME = os.getenv('DAILY_TIME', '15:00')  # Default time is 15:00 (3 PM)
 GRAMMAR_TIME = os.getenv('GRAMMAR_TIME', '08:00')  # Default time is 08:00 (8 AM)
 DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() == 'true'  # Debug mode for testing
 MODEL = os.getenv('MODEL')
+WORKERS = os.getenv('WORKERS', '0')  # 0 = single process, N = sharded mode with N worker processes
+STATE_DB = os.getenv('STATE_DB', 'bot_state.db')  # Shared SQLite state used in sharded mode
+LEADER_LEASE_SECONDS = 90  # Scheduler leadership expires if not renewed within this time
+TELEGRAM_API_BASE = os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org')
+OPENROUTER_URL = os.getenv('OPENROUTER_URL', 'https://openrouter.ai/api/v1/chat/completions')
 
 # Validate required environment variables
 if not all([BOT_TOKEN, CHAT_ID, OPENROUTER_API_KEY]):
@@ -44,6 +56,8 @@ if not all([BOT_TOKEN, CHAT_ID, OPENROUTER_API_KEY]):
     logger.error("- DAILY_TIME (optional, defaults to 15:00)")
     logger.error("- GRAMMAR_TIME (optional, defaults to 08:00)")
     logger.error("- DEBUG_MODE (optional, set to 'true' for testing)")
+    logger.error("- WORKERS (optional, number of worker processes for sharded mode)")
+    logger.error("- STATE_DB (optional, defaults to bot_state.db)")
     exit(1)
 
 try:
@@ -52,9 +66,15 @@ except ValueError:
     logger.error("TELEGRAM_CHAT_ID must be a valid integer")
     exit(1)
 
-API_URL = f"https://api.telegram.org/bot{BOT_TOKEN}"
+try:
+    WORKERS = int(WORKERS)
+except ValueError:
+    logger.error("WORKERS must be a valid integer")
+    exit(1)
 
-# Bot state
+API_URL = f"{TELEGRAM_API_BASE}/bot{BOT_TOKEN}"
+
+# Bot state (single-process mode, sharded mode keeps it in STATE_DB)
 user_sessions = {}  # Support multiple users
 last_update_id = None
 used_words = set()  # เก็บคำที่ใช้ไปแล้ว
@@ -74,15 +94,262 @@ help_text = """🤖 *คำสั่งที่ใช้ได้:*
 📝 *วิธีใช้:* 
 - รอข้อความเตือนตอน 3 ทุ่ม แล้วตอบ 'พร้อม' เพื่อรับคำศัพท์ประจำวัน"""
 
+def new_session():
+    """Create default state for a user seen for the first time"""
+    return {
+        'ready': False,
+        'reminder_sent': False,
+        'last_interaction': datetime.now(),
+        'session_active': False
+    }
+
+class JsonStateStore:
+    """Bot state kept in this process, word history persisted to word_history.json"""
+    def __init__(self, path='word_history.json'):
+        self.path = path
+        self.load_word_history()
+
+    def save_word_history(self):
+        """บันทึกประวัติคำลงไฟล์"""
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                history_data = {
+                    'used_words': list(used_words),
+                    'word_history': word_history
+                }
+                json.dump(history_data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.error(f"Failed to save word history: {e}")
+
+    def load_word_history(self):
+        """โหลดประวัติคำจากไฟล์"""
+        global used_words, word_history
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    used_words = set(data.get('used_words', []))
+                    word_history = data.get('word_history', [])
+                    logger.info(f"📚 Loaded {len(used_words)} previously used words")
+        except Exception as e:
+            logger.error(f"Failed to load word history: {e}")
+            used_words = set()
+            word_history = []
+
+    def get_session(self, user_id):
+        return user_sessions.get(user_id)
+
+    def update_session(self, user_id, changes):
+        user_sessions.setdefault(user_id, new_session()).update(changes)
+
+    def reset_idle_sessions(self):
+        for session in user_sessions.values():
+            if not session.get('session_active', False):  # Only reset if not in active session
+                session['ready'] = False
+                session['reminder_sent'] = False
+
+    def recent_used_words(self, limit):
+        return list(used_words)[-limit:] if used_words else []
+
+    def find_used_words(self, words):
+        return set(words).intersection(used_words)
+
+    def count_used_words(self):
+        return len(used_words)
+
+    def record_words(self, words, attempt):
+        for word in words:
+            used_words.add(word)
+            word_history.append({
+                'word': word,
+                'date': datetime.now().isoformat(),
+                'attempt': attempt
+            })
+        self.save_word_history()
+
+    def recent_history(self, limit):
+        return word_history[-limit:] if word_history else []
+
+    def clear_history(self):
+        used_words.clear()
+        word_history.clear()
+        self.save_word_history()
+
+    def get_last_update_id(self):
+        return last_update_id
+
+    def set_last_update_id(self, update_id):
+        global last_update_id
+        last_update_id = update_id
+
+class SQLiteStateStore:
+    """Bot state shared between processes through a SQLite database in WAL mode"""
+    def __init__(self, path=STATE_DB):
+        self.path = path
+        self.local = threading.local()  # One connection per thread
+        with self.transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions (user_id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS used_words (id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT NOT NULL UNIQUE)")
+            conn.execute("CREATE TABLE IF NOT EXISTS word_history (id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT NOT NULL, date TEXT NOT NULL, attempt INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS job_runs (job TEXT NOT NULL, run_key TEXT NOT NULL, owner TEXT NOT NULL, PRIMARY KEY (job, run_key))")
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # isolation_level=None so transactions are controlled explicitly below
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the database lock up front to avoid upgrade deadlocks"""
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            # Also on KeyboardInterrupt (Ctrl+C, SIGTERM), so the connection is usable afterwards
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def import_json_history(self, path='word_history.json'):
+        """Seed the database once with the history from single-process mode"""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            words = [word for word in data.get('used_words', []) if isinstance(word, str)]
+            # Skip malformed entries instead of failing startup
+            history = [
+                (item['word'], item.get('date') or datetime.now().isoformat(), item.get('attempt', 1))
+                for item in data.get('word_history', [])
+                if isinstance(item, dict) and isinstance(item.get('word'), str)
+            ]
+        except Exception as e:
+            logger.error(f"Failed to load word history: {e}")
+            return
+        with self.transaction() as conn:
+            # Checked via a marker, not row counts, so a later 'clear' is not undone on restart
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+                return
+            conn.executemany("INSERT OR IGNORE INTO used_words (word) VALUES (?)", [(word,) for word in words])
+            conn.executemany("INSERT INTO word_history (word, date, attempt) VALUES (?, ?, ?)", history)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', '1')")
+        logger.info(f"📚 Imported word history from {path}")
+
+    def get_session(self, user_id):
+        row = self.connect().execute("SELECT data FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        session = json.loads(row[0])
+        session['last_interaction'] = datetime.fromisoformat(session['last_interaction'])
+        return session
+
+    def update_session(self, user_id, changes):
+        """Merge changed fields into the stored session, keeping concurrent updates to other fields"""
+        with self.transaction() as conn:
+            row = conn.execute("SELECT data FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+            if row:
+                data = json.loads(row[0])
+            else:
+                data = dict(new_session(), last_interaction=datetime.now().isoformat())
+            for key, value in changes.items():
+                data[key] = value.isoformat() if isinstance(value, datetime) else value
+            conn.execute("INSERT OR REPLACE INTO sessions (user_id, data) VALUES (?, ?)", (user_id, json.dumps(data)))
+
+    def reset_idle_sessions(self):
+        with self.transaction() as conn:
+            for user_id, data in conn.execute("SELECT user_id, data FROM sessions").fetchall():
+                session = json.loads(data)
+                if not session.get('session_active', False):  # Only reset if not in active session
+                    session['ready'] = False
+                    session['reminder_sent'] = False
+                    conn.execute("UPDATE sessions SET data = ? WHERE user_id = ?", (json.dumps(session), user_id))
+
+    def recent_used_words(self, limit):
+        rows = self.connect().execute("SELECT word FROM used_words ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def find_used_words(self, words):
+        words = list(words)
+        if not words:
+            return set()
+        placeholders = ','.join('?' * len(words))
+        rows = self.connect().execute(f"SELECT word FROM used_words WHERE word IN ({placeholders})", words).fetchall()
+        return {row[0] for row in rows}
+
+    def count_used_words(self):
+        return self.connect().execute("SELECT COUNT(*) FROM used_words").fetchone()[0]
+
+    def record_words(self, words, attempt):
+        now = datetime.now().isoformat()
+        with self.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO used_words (word) VALUES (?)", [(word,) for word in words])
+            conn.executemany("INSERT INTO word_history (word, date, attempt) VALUES (?, ?, ?)",
+                             [(word, now, attempt) for word in words])
+
+    def recent_history(self, limit):
+        rows = self.connect().execute(
+            "SELECT word, date, attempt FROM word_history ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [{'word': word, 'date': date, 'attempt': attempt} for word, date, attempt in reversed(rows)]
+
+    def clear_history(self):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM used_words")
+            conn.execute("DELETE FROM word_history")
+
+    def get_last_update_id(self):
+        row = self.connect().execute("SELECT value FROM meta WHERE key = 'last_update_id'").fetchone()
+        return int(row[0]) if row else None
+
+    def set_last_update_id(self, update_id):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_update_id', ?)", (str(update_id),))
+
+    def acquire_leadership(self, owner, ttl=LEADER_LEASE_SECONDS, name='scheduler'):
+        """Take or renew the named lease; only one owner holds it until it expires"""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row and row[0] != owner and row[1] > now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)",
+                         (name, owner, now + ttl))
+            return True
+
+    def release_leadership(self, owner, name='scheduler'):
+        """Give up the named lease so another owner can take it without waiting for expiry"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def claim_job_run(self, job, run_key, owner):
+        """Record that a job ran for run_key; False if another process already claimed it"""
+        with self.transaction() as conn:
+            cursor = conn.execute("INSERT OR IGNORE INTO job_runs (job, run_key, owner) VALUES (?, ?, ?)",
+                                  (job, run_key, owner))
+            return cursor.rowcount == 1
+
+    def job_claimed(self, job, run_key):
+        row = self.connect().execute("SELECT 1 FROM job_runs WHERE job = ? AND run_key = ?", (job, run_key)).fetchone()
+        return row is not None
+
 class VocabularyBot:
-    def __init__(self):
+    def __init__(self, store=None):
         self.session = requests.Session()
         # Set reasonable timeouts
         self.session.timeout = (10, 30)  # (connect, read) timeout
-        
+
         # โหลดประวัติคำที่ใช้แล้ว
-        self.load_word_history()
-        
+        self.store = store or JsonStateStore()
+
     def send_message(self, chat_id, text, parse_mode='Markdown'):
         """Send message to Telegram chat with error handling"""
         # Validate that text is not empty
@@ -144,43 +411,16 @@ class VocabularyBot:
         
         return words
 
-    def save_word_history(self):
-        """บันทึกประวัติคำลงไฟล์"""
-        try:
-            with open('word_history.json', 'w', encoding='utf-8') as f:
-                history_data = {
-                    'used_words': list(used_words),
-                    'word_history': word_history
-                }
-                json.dump(history_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save word history: {e}")
-
-    def load_word_history(self):
-        """โหลดประวัติคำจากไฟล์"""
-        global used_words, word_history
-        try:
-            if os.path.exists('word_history.json'):
-                with open('word_history.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    used_words = set(data.get('used_words', []))
-                    word_history = data.get('word_history', [])
-                    logger.info(f"📚 Loaded {len(used_words)} previously used words")
-        except Exception as e:
-            logger.error(f"Failed to load word history: {e}")
-            used_words = set()
-            word_history = []
-
     def get_vocabulary_from_openrouter(self, avoid_repetition=True, max_retries=3):
         """Get vocabulary words from OpenRouter API with repetition avoidance"""
-        url = "https://openrouter.ai/api/v1/chat/completions"
+        url = OPENROUTER_URL
         headers = {
             "Authorization": f"Bearer {OPENROUTER_API_KEY}",
             "Content-Type": "application/json",
         }
         
         # สร้างรายการคำที่ใช้แล้ว (เฉพาะคำล่าสุด 50 คำ เพื่อไม่ให้ prompt ยาวเกินไป)
-        recent_used_words = list(used_words)[-50:] if used_words else []
+        recent_used_words = self.store.recent_used_words(50)
         avoid_words_text = ""
         
         if avoid_repetition and recent_used_words:
@@ -247,25 +487,16 @@ class VocabularyBot:
                     new_words = self.extract_words_from_response(content)
                     
                     # ตรวจสอบว่ามีคำซ้ำไหม
-                    repeated_words = new_words.intersection(used_words)
+                    repeated_words = self.store.find_used_words(new_words)
                     
                     if repeated_words and attempt < max_retries - 1:
                         logger.warning(f"🔄 Attempt {attempt + 1}: Found repeated words {repeated_words}, retrying...")
                         continue
                     
                     # บันทึกคำใหม่
-                    for word in new_words:
-                        used_words.add(word)
-                        word_history.append({
-                            'word': word,
-                            'date': datetime.now().isoformat(),
-                            'attempt': attempt + 1
-                        })
+                    self.store.record_words(new_words, attempt + 1)
                     
-                    # บันทึกลงไฟล์
-                    self.save_word_history()
-                    
-                    logger.info(f"✅ Generated {len(new_words)} new vocabulary words (Total used: {len(used_words)})")
+                    logger.info(f"✅ Generated {len(new_words)} new vocabulary words (Total used: {self.store.count_used_words()})")
                     if repeated_words:
                         logger.info(f"⚠️  Some repeated words were included: {repeated_words}")
                 
@@ -285,7 +516,7 @@ class VocabularyBot:
 
     def get_grammar_from_openrouter(self, max_retries=3):
         """Get English grammar lesson from OpenRouter API"""
-        url = "https://openrouter.ai/api/v1/chat/completions"
+        url = OPENROUTER_URL
         headers = {
             "Authorization": f"Bearer {OPENROUTER_API_KEY}",
             "Content-Type": "application/json",
@@ -362,21 +593,24 @@ class VocabularyBot:
         return None
 
     def handle_user_message(self, chat_id, text):
-        global used_words, word_history
-
         """Handle incoming user messages"""
         user_id = str(chat_id)
         
         # Initialize user session if doesn't exist
-        if user_id not in user_sessions:
-            user_sessions[user_id] = {
-                'ready': False,
-                'reminder_sent': False,
-                'last_interaction': datetime.now(),
-                'session_active': False
-            }
+        session = self.store.get_session(user_id)
+        if session is None:
+            session = new_session()
+        original = dict(session)
         
-        session = user_sessions[user_id]
+        try:
+            self.process_user_message(chat_id, text, session)
+        finally:
+            # Write back only what this message changed, so a daily reset that ran meanwhile is kept
+            changes = {key: value for key, value in session.items() if key not in original or original[key] != value}
+            self.store.update_session(user_id, changes)
+
+    def process_user_message(self, chat_id, text, session):
+        """Reply to a user message, updating the user's session in place"""
         text_lower = text.strip().lower()
         
         logger.info(f"Processing message from {chat_id}: '{text_lower}'")
@@ -450,8 +684,8 @@ class VocabularyBot:
             
             if text_lower in ['stats', 'สถิติ', 'ข้อมูล']:
                 logger.info(f"📊 Sending statistics to user {chat_id}")
-                total_words = len(used_words)
-                recent_words = word_history[-5:] if word_history else []
+                total_words = self.store.count_used_words()
+                recent_words = self.store.recent_history(5)
                 
                 stats_text = f"📊 *สถิติการเรียนรู้*\n\n"
                 stats_text += f"🔢 จำนวนคำทั้งหมด: {total_words} คำ\n\n"
@@ -468,9 +702,7 @@ class VocabularyBot:
                 
             elif text_lower in ['clear', 'ล้าง', 'ลบประวัติ']:
                 logger.info(f"🗑️ Clearing word history for user {chat_id}")
-                used_words.clear()
-                word_history.clear()
-                self.save_word_history()
+                self.store.clear_history()
                 self.send_message(chat_id, "🗑️ ลบประวัติคำศัพท์ทั้งหมดแล้ว! ตอนนี้สามารถได้คำซ้ำได้อีกครั้ง")
                     
             else:
@@ -482,10 +714,7 @@ class VocabularyBot:
         logger.info("🚀 Starting daily vocabulary job")
         
         # Reset all user sessions for new day  
-        for session in user_sessions.values():
-            if not session.get('session_active', False):  # Only reset if not in active session
-                session['ready'] = False
-                session['reminder_sent'] = False
+        self.store.reset_idle_sessions()
         
         # Send initial prompt
         success = self.send_message(
@@ -519,9 +748,10 @@ class VocabularyBot:
             fallback_message = "🌅 *สวัสดีตอนเช้าครับ!*\n\nขออภัยครับ ตอนนี้ไม่สามารถดึงบทเรียนไวยากรณ์ได้ กรุณาลองใหม่อีกครั้งหรือพิมพ์ 'grammar' เพื่อขอบทเรียนใหม่"
             self.send_message(CHAT_ID, fallback_message)
 
-    def start_continuous_listener(self):
+    def start_continuous_listener(self, dispatch=None):
         """Start continuous message listener (runs in background)"""
-        global last_update_id
+        dispatch = dispatch or self.handle_user_message
+        last_update_id = self.store.get_last_update_id()
         
         logger.info("🎧 Starting continuous message listener...")
         
@@ -542,7 +772,9 @@ class VocabularyBot:
                         logger.info(f"📨 Received message from {chat_id}: {text}")
                         
                         # Process the message
-                        self.handle_user_message(chat_id, text)
+                        dispatch(chat_id, text)
+                    
+                    self.store.set_last_update_id(last_update_id)
                 
                 time.sleep(2)  # Poll every 2 seconds
                 
@@ -553,10 +785,165 @@ class VocabularyBot:
                 logger.error(f"Error in listener: {e}")
                 time.sleep(5)
 
+def shard_for_chat(chat_id, workers):
+    """Pick the worker that owns a chat; stable across processes and restarts"""
+    return zlib.crc32(str(chat_id).encode('utf-8')) % workers
+
+def run_exclusive_job(store, owner, job_name, job, poll_interval=5):
+    """Run a scheduled job once per day across all workers, on whichever worker holds the lease"""
+    run_key = datetime.now().strftime('%Y-%m-%d')
+    deadline = time.time() + LEADER_LEASE_SECONDS + poll_interval
+    # Non-leaders wait for the leader to claim the job; if the leader died, its lease
+    # goes stale and one of the waiting workers takes over and runs the job instead
+    while not store.acquire_leadership(owner):
+        if store.job_claimed(job_name, run_key):
+            logger.info(f"⏭️ Skipping {job_name}, the scheduler leader ran it")
+            return
+        if time.time() > deadline:
+            logger.error(f"❌ Gave up waiting for {job_name}, the scheduler lease was never freed")
+            return
+        time.sleep(poll_interval)
+    if not store.claim_job_run(job_name, run_key, owner):
+        logger.info(f"⏭️ Skipping {job_name}, it already ran today")
+        return
+    job()
+
+def run_leader_scheduler(store, owner):
+    """Keep the scheduler lease renewed and run pending jobs (runs in background)"""
+    is_leader = False
+    while True:
+        try:
+            leader = store.acquire_leadership(owner)
+            if leader != is_leader:
+                logger.info(f"👑 {owner} {'is now' if leader else 'is no longer'} the scheduler leader")
+                is_leader = leader
+            # Every worker advances its schedule; run_exclusive_job makes sure one of them acts
+            schedule.run_pending()
+        except Exception as e:
+            logger.error(f"Error in scheduler: {e}")
+        time.sleep(30)  # Check every 30 seconds
+
+def run_worker(index, inbox, parent_pid):
+    """Worker process: handle messages for its shard of chats and run scheduled jobs when leader"""
+    # Ctrl+C reaches the whole process group; the ingestion process stops workers with a None
+    # sentinel once their inbox is handled, since those updates are already acknowledged to Telegram
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    store = SQLiteStateStore(STATE_DB)
+    bot = VocabularyBot(store=store)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    
+    schedule.every().day.at(GRAMMAR_TIME).do(run_exclusive_job, store, owner, 'daily_grammar', bot.daily_grammar_job)
+    schedule.every().day.at(DAILY_TIME).do(run_exclusive_job, store, owner, 'daily_vocabulary', bot.daily_vocabulary_job)
+    scheduler_thread = threading.Thread(target=run_leader_scheduler, args=(store, owner), daemon=True)
+    scheduler_thread.start()
+    
+    logger.info(f"👷 Worker {index} started ({owner})")
+    try:
+        while True:
+            try:
+                item = inbox.get(timeout=5)
+            except queue.Empty:
+                # Stop instead of lingering as an orphan when the ingestion process was killed
+                if os.getppid() != parent_pid:
+                    logger.warning(f"Worker {index} lost its parent process, stopping")
+                    break
+                continue
+            if item is None:
+                break
+            chat_id, text = item
+            try:
+                bot.handle_user_message(chat_id, text)
+            except Exception as e:
+                logger.error(f"Error in worker {index}: {e}")
+    finally:
+        store.release_leadership(owner)
+    logger.info(f"Worker {index} stopped")
+
+def stop_on_sigterm(signum, frame):
+    """Turn SIGTERM (docker stop, reload_script.py) into the same shutdown path as Ctrl+C"""
+    raise KeyboardInterrupt
+
+def run_sharded(workers):
+    """Poll Telegram in this process and route each chat to one of the worker processes"""
+    store = SQLiteStateStore(STATE_DB)
+    store.import_json_history()
+    
+    # Spawned workers start from a fresh interpreter, so no SQLite connection is carried across fork()
+    context = multiprocessing.get_context('spawn')
+    inboxes = [context.Queue() for _ in range(workers)]
+    processes = [None] * workers
+    workers_lock = threading.RLock()
+    stopping = threading.Event()
+    
+    def start_worker(index):
+        process = context.Process(target=run_worker, args=(index, inboxes[index], os.getpid()), name=f"worker-{index}")
+        process.start()
+        processes[index] = process
+    
+    def ensure_worker(index):
+        """Restart a worker that died so its shard of chats keeps getting replies"""
+        with workers_lock:
+            if stopping.is_set() or processes[index].is_alive():
+                return
+            logger.error(f"❌ Worker {index} exited with code {processes[index].exitcode}, restarting it")
+            # A killed worker may still hold the queue's read lock, so the new one gets a fresh
+            # inbox; whatever can still be read from the old one is carried over. route() puts
+            # under the same lock, and the timeout leaves the queue's feeder thread time to flush
+            old_inbox, inboxes[index] = inboxes[index], context.Queue()
+            try:
+                while True:
+                    inboxes[index].put(old_inbox.get(timeout=0.5))
+            except queue.Empty:
+                pass
+            old_inbox.cancel_join_thread()
+            start_worker(index)
+    
+    def supervise_workers():
+        while not stopping.wait(5):  # Check every 5 seconds
+            for index in range(workers):
+                ensure_worker(index)
+    
+    def route(chat_id, text):
+        """Queue a message for its chat's worker.
+
+        The Telegram offset is saved once a batch is routed, not when it is handled, so a
+        message a worker has already taken (or one stuck in the inbox of a worker that was
+        killed while holding its read lock) is lost if that worker crashes."""
+        index = shard_for_chat(chat_id, workers)
+        with workers_lock:
+            ensure_worker(index)
+            inboxes[index].put((chat_id, text))
+    
+    signal.signal(signal.SIGTERM, stop_on_sigterm)
+    try:
+        for index in range(workers):
+            start_worker(index)
+        logger.info(f"🧩 Started {workers} worker processes, shared state in {STATE_DB}")
+        threading.Thread(target=supervise_workers, daemon=True).start()
+        
+        # The ingestion process only polls and routes; it never handles messages itself
+        bot = VocabularyBot(store=store)
+        bot.start_continuous_listener(dispatch=route)
+    finally:
+        with workers_lock:
+            stopping.set()
+            started = [process for process in processes if process is not None]
+            for inbox in inboxes:
+                inbox.put(None)
+            for process in started:
+                process.join(timeout=30)  # Let a worker finish the message it is handling
+                if process.is_alive():
+                    process.terminate()
+        logger.info("Bot stopped")
+
 def main():
     """Main function to run the bot"""
     logger.info("Starting Vocabulary Bot...")
     
+    if WORKERS > 0:
+        run_sharded(WORKERS)
+        return
+    
     bot = VocabularyBot()
     
     # Test bot immediately
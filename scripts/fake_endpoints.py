@@ -0,0 +1,144 @@
+# fake_endpoints.py
+# Local stand-ins for the Telegram Bot API and OpenRouter, for running main.py without network access.
+#
+#   python scripts/fake_endpoints.py --messages 80
+#   TELEGRAM_API_BASE=http://127.0.0.1:8765 OPENROUTER_URL=http://127.0.0.1:8765/chat/completions python main.py
+#
+# GET /stats returns how many messages the bot sent and when.
+import argparse
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+
+class FakeState:
+    def __init__(self, messages, text='new', delay=3.0, latency=0.2):
+        self.messages = messages  # จำนวนข้อความที่จะส่งให้บอท (หนึ่งข้อความต่อหนึ่ง chat)
+        self.text = text
+        self.delay = delay        # รอให้ worker พร้อมก่อนส่งข้อความ
+        self.latency = latency    # เวลาตอบของ OpenRouter จำลอง
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.served = False
+            self.completions = 0
+            self.sent = 0
+            self.sent_by_chat = {}
+            self.first = None
+            self.last = None
+
+    def next_updates(self):
+        with self.lock:
+            if self.served or time.time() - self.started < self.delay:
+                return []
+            self.served = True
+            self.first = time.time()
+        return [
+            {'update_id': i, 'message': {'chat': {'id': 1000 + i}, 'text': self.text}}
+            for i in range(self.messages)
+        ]
+
+    def record_sent(self, chat_id):
+        with self.lock:
+            self.sent += 1
+            self.sent_by_chat[chat_id] = self.sent_by_chat.get(chat_id, 0) + 1
+            self.last = time.time()
+
+    def next_word(self):
+        with self.lock:
+            self.completions += 1
+            n = self.completions
+        # คำไม่ซ้ำกันทุกครั้ง เพื่อไม่ให้บอทต้องขอคำใหม่ซ้ำ
+        return 'vocab' + ''.join(chr(97 + (n // 26 ** k) % 26) for k in range(4))
+
+    def stats(self):
+        with self.lock:
+            return {
+                'sent': self.sent,
+                'sent_by_chat': self.sent_by_chat,
+                'completions': self.completions,
+                'first': self.first,
+                'last': self.last,
+            }
+
+
+def make_handler(state):
+    class FakeHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def reply(self, obj):
+            body = json.dumps(obj).encode('utf-8')
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The bot was stopped mid-request
+
+        def read_body(self):
+            length = int(self.headers.get('Content-Length', 0))
+            return self.rfile.read(length).decode('utf-8')
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path.endswith('/getUpdates'):
+                updates = state.next_updates()
+                if not updates:
+                    time.sleep(0.5)  # Short long-poll
+                return self.reply({'ok': True, 'result': updates})
+            if path == '/stats':
+                return self.reply(state.stats())
+            self.send_error(404)
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            body = self.read_body()
+            if path.endswith('/sendMessage'):
+                fields = dict(pair.split('=', 1) for pair in body.split('&') if '=' in pair)
+                state.record_sent(fields.get('chat_id'))
+                return self.reply({'ok': True, 'result': {}})
+            if path.endswith('/chat/completions'):
+                time.sleep(state.latency)
+                content = f"1. **{state.next_word()}** [ˈvɒkæb] - คำศัพท์ทดสอบ"
+                return self.reply({'choices': [{'message': {'content': content}}]})
+            self.send_error(404)
+
+    return FakeHandler
+
+
+def start_server(state, port=8765):
+    """Serve the fake endpoints in a background thread and return the server"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Telegram and OpenRouter endpoints')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--messages', type=int, default=80, help='messages delivered in one getUpdates batch')
+    parser.add_argument('--text', default='new', help='text of every message')
+    parser.add_argument('--delay', type=float, default=3.0, help='seconds before the batch is delivered')
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds per OpenRouter completion')
+    args = parser.parse_args()
+
+    state = FakeState(args.messages, args.text, args.delay, args.latency)
+    start_server(state, args.port)
+    print(f"Fake Telegram/OpenRouter listening on http://127.0.0.1:{args.port}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
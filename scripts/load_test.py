@@ -0,0 +1,119 @@
+# load_test.py
+# Run main.py against the fake endpoints and report how long it takes to answer a batch of chats.
+#
+#   python scripts/load_test.py --workers 0 1 2 4 8 --messages 80
+#   python scripts/load_test.py --workers 4 --check-jobs
+#
+# --workers 0 is the single-process bot. --check-jobs schedules both daily jobs for the next
+# minute and checks that the workers send them exactly once between them.
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fake_endpoints import FakeState, start_server
+
+MAIN_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+CHAT_ID = 1  # Chat that receives the scheduled daily messages
+
+
+def start_bot(workers, port, workdir, extra_env=None):
+    env = dict(
+        os.environ,
+        TELEGRAM_BOT_TOKEN='fake-token',
+        TELEGRAM_CHAT_ID=str(CHAT_ID),
+        OPENROUTER_API_KEY='fake-key',
+        MODEL='fake-model',
+        WORKERS=str(workers),
+        TELEGRAM_API_BASE=f'http://127.0.0.1:{port}',
+        OPENROUTER_URL=f'http://127.0.0.1:{port}/chat/completions',
+        **(extra_env or {})
+    )
+    log = open(os.path.join(workdir, 'output.log'), 'w', encoding='utf-8')
+    return subprocess.Popen([sys.executable, MAIN_PY], cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def stop_bot(bot):
+    bot.send_signal(signal.SIGTERM)
+    try:
+        bot.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        bot.kill()
+        bot.wait()
+
+
+def wait_for(state, expected, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if state.stats()['sent'] >= expected:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def run_throughput(workers, args):
+    state = FakeState(args.messages, 'new', args.delay, args.latency)
+    server = start_server(state, args.port)
+    with tempfile.TemporaryDirectory() as workdir:
+        bot = start_bot(workers, args.port, workdir)
+        try:
+            # 'new' is answered with a "please wait" message and then the vocabulary
+            finished = wait_for(state, 2 * args.messages, args.delay + args.timeout)
+        finally:
+            stop_bot(bot)
+            server.shutdown()
+            server.server_close()
+    stats = state.stats()
+    if not finished:
+        print(f"workers={workers}: FAILED, only {stats['sent']} of {2 * args.messages} messages sent")
+        return False
+    elapsed = stats['last'] - stats['first']
+    print(f"workers={workers}: {args.messages} chats answered in {elapsed:.2f}s "
+          f"({args.messages / elapsed:.1f} chats/s)")
+    return True
+
+
+def run_job_check(workers, args):
+    # Both jobs are due at the start of the next minute; the scheduler polls every 30 seconds
+    due = datetime.now() + timedelta(minutes=1)
+    job_time = due.strftime('%H:%M')
+    state = FakeState(0, 'new', 0, args.latency)
+    server = start_server(state, args.port)
+    with tempfile.TemporaryDirectory() as workdir:
+        bot = start_bot(workers, args.port, workdir, {'DAILY_TIME': job_time, 'GRAMMAR_TIME': job_time})
+        try:
+            print(f"workers={workers}: waiting for jobs due at {job_time}...")
+            wait_for(state, 2, 120)
+            time.sleep(35)  # Give every other worker a scheduler tick to send a duplicate
+        finally:
+            stop_bot(bot)
+            server.shutdown()
+            server.server_close()
+    sent = state.stats()['sent_by_chat'].get(str(CHAT_ID), 0)
+    ok = sent == 2
+    print(f"workers={workers}: {'OK' if ok else 'FAILED'}, {sent} scheduled messages sent (expected 2)")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test main.py against fake endpoints')
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4, 8])
+    parser.add_argument('--messages', type=int, default=80)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=3.0, help='seconds for the workers to start up')
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds per OpenRouter completion')
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--check-jobs', action='store_true', help='check scheduled jobs instead of throughput')
+    args = parser.parse_args()
+
+    run = run_job_check if args.check_jobs else run_throughput
+    results = [run(workers, args) for workers in args.workers]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+# main.py validates its configuration at import time
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'test-token')
+os.environ.setdefault('TELEGRAM_CHAT_ID', '1')
+os.environ.setdefault('OPENROUTER_API_KEY', 'test-key')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+class ShardRoutingTest(unittest.TestCase):
+    def test_shard_is_in_range_and_stable(self):
+        for chat_id in [0, 1, -1001234567890, 987654321]:
+            shard = main.shard_for_chat(chat_id, 4)
+            self.assertIn(shard, range(4))
+            self.assertEqual(shard, main.shard_for_chat(chat_id, 4))
+        # Must not depend on per-process hash randomization
+        self.assertEqual(main.shard_for_chat(1001, 8), 1)
+        self.assertEqual(main.shard_for_chat(-1001234567890, 8), 5)
+
+    def test_chats_spread_over_all_workers(self):
+        counts = [0] * 4
+        for chat_id in range(1000, 2000):
+            counts[main.shard_for_chat(chat_id, 4)] += 1
+        self.assertTrue(all(count > 150 for count in counts), counts)
+
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = main.SQLiteStateStore(os.path.join(self.tmpdir, 'state.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write_history(self, data):
+        path = os.path.join(self.tmpdir, 'word_history.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return path
+
+
+class SQLiteStateStoreTest(StoreTestCase):
+    def test_session_round_trip(self):
+        self.assertIsNone(self.store.get_session('42'))
+        now = datetime.now()
+        self.store.update_session('42', {'ready': True, 'last_interaction': now})
+        session = self.store.get_session('42')
+        self.assertTrue(session['ready'])
+        self.assertFalse(session['reminder_sent'])
+        self.assertEqual(session['last_interaction'], now)
+
+    def test_update_session_keeps_concurrent_reset(self):
+        self.store.update_session('42', {'ready': True, 'reminder_sent': True})
+        session = self.store.get_session('42')  # Worker loads the session...
+        self.store.reset_idle_sessions()        # ...the daily job resets it meanwhile...
+        session['last_interaction'] = datetime.now()
+        self.store.update_session('42', {'last_interaction': session['last_interaction']})
+        stored = self.store.get_session('42')
+        self.assertFalse(stored['ready'])
+        self.assertFalse(stored['reminder_sent'])
+
+    def test_reset_keeps_active_sessions(self):
+        self.store.update_session('1', {'ready': True, 'session_active': True})
+        self.store.update_session('2', {'ready': True})
+        self.store.reset_idle_sessions()
+        self.assertTrue(self.store.get_session('1')['ready'])
+        self.assertFalse(self.store.get_session('2')['ready'])
+
+    def test_word_history(self):
+        self.store.record_words({'apple', 'brave'}, 1)
+        self.store.record_words({'apple', 'cider'}, 2)
+        self.assertEqual(self.store.count_used_words(), 3)
+        self.assertEqual(self.store.find_used_words(['apple', 'zebra']), {'apple'})
+        self.assertEqual(len(self.store.recent_history(3)), 3)
+        self.assertEqual(self.store.recent_history(1)[0]['attempt'], 2)
+        self.store.clear_history()
+        self.assertEqual(self.store.count_used_words(), 0)
+        self.assertEqual(self.store.recent_history(5), [])
+
+    def test_last_update_id(self):
+        self.assertIsNone(self.store.get_last_update_id())
+        self.store.set_last_update_id(81)
+        self.assertEqual(self.store.get_last_update_id(), 81)
+
+    def test_interrupted_transaction_is_rolled_back(self):
+        with self.assertRaises(KeyboardInterrupt):
+            with self.store.transaction() as conn:
+                conn.execute("INSERT INTO used_words (word) VALUES ('apple')")
+                raise KeyboardInterrupt
+        self.assertEqual(self.store.count_used_words(), 0)
+        self.store.acquire_leadership('a', ttl=60)
+        self.store.release_leadership('a')
+        self.assertTrue(self.store.acquire_leadership('b', ttl=60))
+
+    def test_state_is_shared_between_store_instances(self):
+        other = main.SQLiteStateStore(self.store.path)
+        self.store.record_words({'apple'}, 1)
+        self.assertEqual(other.find_used_words(['apple']), {'apple'})
+
+    def test_json_history_is_imported_only_once(self):
+        path = self.write_history({
+            'used_words': ['apple', 'brave'],
+            'word_history': [{'word': 'apple', 'date': '2025-08-10T15:23:21', 'attempt': 1}],
+        })
+        self.store.import_json_history(path)
+        self.assertEqual(self.store.count_used_words(), 2)
+        self.store.clear_history()
+        main.SQLiteStateStore(self.store.path).import_json_history(path)
+        self.assertEqual(self.store.count_used_words(), 0)
+
+    def test_json_history_skips_malformed_entries(self):
+        path = self.write_history({
+            'used_words': ['apple', 7],
+            'word_history': [{'word': 'apple'}, {'date': '2025-08-10T15:23:21'}, 'brave'],
+        })
+        self.store.import_json_history(path)
+        self.assertEqual(self.store.count_used_words(), 1)
+        self.assertEqual([item['word'] for item in self.store.recent_history(5)], ['apple'])
+
+
+class LeaderElectionTest(StoreTestCase):
+    def test_lease_is_exclusive_until_it_expires(self):
+        self.assertTrue(self.store.acquire_leadership('a', ttl=60))
+        self.assertFalse(self.store.acquire_leadership('b', ttl=60))
+        self.assertTrue(self.store.acquire_leadership('a', ttl=-1))  # Renewed, but already expired
+        self.assertTrue(self.store.acquire_leadership('b', ttl=60))
+        self.assertFalse(self.store.acquire_leadership('a', ttl=60))
+
+    def test_released_lease_can_be_taken(self):
+        self.store.acquire_leadership('a', ttl=60)
+        self.store.release_leadership('b')  # Not the owner, no effect
+        self.assertFalse(self.store.acquire_leadership('b', ttl=60))
+        self.store.release_leadership('a')
+        self.assertTrue(self.store.acquire_leadership('b', ttl=60))
+
+    def test_job_run_is_claimed_once(self):
+        self.assertFalse(self.store.job_claimed('daily_grammar', '2026-10-19'))
+        self.assertTrue(self.store.claim_job_run('daily_grammar', '2026-10-19', 'a'))
+        self.assertFalse(self.store.claim_job_run('daily_grammar', '2026-10-19', 'b'))
+        self.assertTrue(self.store.job_claimed('daily_grammar', '2026-10-19'))
+        self.assertTrue(self.store.claim_job_run('daily_grammar', '2026-10-20', 'b'))
+
+
+class ExclusiveJobTest(StoreTestCase):
+    def run_job(self, owner):
+        runs = []
+        main.run_exclusive_job(self.store, owner, 'daily_grammar', lambda: runs.append(owner), poll_interval=0.01)
+        return runs
+
+    def test_job_runs_once_per_day(self):
+        self.assertEqual(self.run_job('a'), ['a'])
+        self.assertEqual(self.run_job('a'), [])
+
+    def test_non_leader_skips_job_the_leader_ran(self):
+        self.store.acquire_leadership('a', ttl=60)
+        self.assertEqual(self.run_job('a'), ['a'])
+        self.assertEqual(self.run_job('b'), [])
+
+    def test_non_leader_waits_for_the_leader(self):
+        self.store.acquire_leadership('a', ttl=60)
+        leader = threading.Timer(0.1, self.run_job, args=('a',))
+        leader.start()
+        self.assertEqual(self.run_job('b'), [])
+        leader.join()
+        self.assertTrue(self.store.job_claimed('daily_grammar', datetime.now().strftime('%Y-%m-%d')))
+
+    def test_job_is_taken_over_when_the_leader_lease_expires(self):
+        # Leader died just before the job was due; its lease is still valid for a moment
+        self.store.acquire_leadership('dead', ttl=0.2)
+        started = time.time()
+        self.assertEqual(self.run_job('b'), ['b'])
+        self.assertGreaterEqual(time.time() - started, 0.15)
+
+
+class ShardedBotTest(StoreTestCase):
+    def test_messages_update_shared_state(self):
+        bot = main.VocabularyBot(store=self.store)
+        sent = []
+        bot.send_message = lambda chat_id, text, parse_mode='Markdown': sent.append((chat_id, text)) or True
+        bot.get_vocabulary_from_openrouter = lambda: self.store.record_words({'apple'}, 1) or '**apple**'
+
+        bot.handle_user_message(42, 'hello')
+        self.assertTrue(self.store.get_session('42')['reminder_sent'])
+        bot.handle_user_message(42, 'พร้อม')
+        self.assertTrue(self.store.get_session('42')['ready'])
+        self.assertEqual(self.store.count_used_words(), 1)
+
+        bot.handle_user_message(42, 'reset')
+        self.assertFalse(self.store.get_session('42')['ready'])
+        self.assertEqual(len(sent), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()